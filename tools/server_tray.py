@@ -8,32 +8,72 @@ import threading
 import time
 import os
 import sys
+import socket
+from concurrent.futures import ThreadPoolExecutor, wait, ALL_COMPLETED
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import asyncio
 import json
+import queue
+import importlib.util
+import webbrowser
 
-# Third-party imports
-try:
-    import pystray
-    from pystray import MenuItem as item
-    from PIL import Image, ImageDraw
-except ImportError:
-    print("Installing required packages...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pystray", "Pillow"])
-    import pystray
-    from pystray import MenuItem as item
-    from PIL import Image, ImageDraw
+# Third-party packages as (import name, pip name); everything in _OPTIONAL has a fallback
+_REQUIRED = [("pystray", "pystray"), ("PIL", "Pillow")]
+_OPTIONAL = [("winotify", "winotify"), ("psutil", "psutil"), ("win32job", "pywin32")]
+
+
+def ensure_deps():
+    """Install missing third-party packages with a single pip call.
+
+    find_spec only checks the import path, so the common case where
+    everything is installed never spawns a subprocess.
+    """
+    missing = [pkg for mod, pkg in _REQUIRED + _OPTIONAL if importlib.util.find_spec(mod) is None]
+    if not missing:
+        return
+    print(f"Installing required packages: {', '.join(missing)}")
+    try:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
+    except subprocess.CalledProcessError:
+        # Only the required packages are fatal; the rest degrade gracefully
+        if any(importlib.util.find_spec(mod) is None for mod, _ in _REQUIRED):
+            raise
+    importlib.invalidate_caches()
+
+
+# Runs before the third-party imports below, which need the packages present
+ensure_deps()
+
+import pystray
+from pystray import MenuItem as item
+from PIL import Image, ImageDraw, ImageFont
 
 try:
     from winotify import Notification, audio
     USE_WINOTIFY = True
 except ImportError:
-    try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "winotify"])
-        from winotify import Notification, audio
-        USE_WINOTIFY = True
-    except:
-        USE_WINOTIFY = False
+    USE_WINOTIFY = False
+
+try:
+    import psutil
+    USE_PSUTIL = True
+except ImportError:
+    USE_PSUTIL = False
+
+try:
+    import win32api
+    import win32con
+    import win32job
+    USE_JOB_OBJECTS = True
+except ImportError:
+    USE_JOB_OBJECTS = False
+
+# orjson is optional: faster, and emits UTF-8 bytes without a separate encode step
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    _dumps = lambda obj: json.dumps(obj).encode()
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -41,47 +81,164 @@ SERVER_PATH = PROJECT_ROOT / "server"
 CLIENT_PATH = PROJECT_ROOT / "prototype"
 TRAEFIK_PATH = PROJECT_ROOT / "infrastructure" / "traefik"
 TRAEFIK_EXE = TRAEFIK_PATH / "traefik.exe"
+_TRAEFIK_AVAILABLE = TRAEFIK_EXE.exists()  # Checked once; the binary does not come and go at runtime
 UV_PATH = Path.home() / ".local" / "bin" / "uv.exe"
 
 CONTROL_PORT = 7711  # Control API port
-
-class ControlHandler(BaseHTTPRequestHandler):
-    """HTTP handler for remote control of the tray app."""
+COLYSEUS_PORT = 2567
+HTTP_PORT = 3000
+TRAEFIK_DASHBOARD_PORT = 8080
+STARTUP_TIMEOUT = 15  # Seconds to wait for each server to accept connections
+SHUTDOWN_TIMEOUT = 10  # Seconds to wait for servers to release their ports
+STATUS_CACHE_TTL = 0.25  # Seconds a get_status() result stays valid
+SSE_MAX_BUFFER = 64 * 1024  # Unsent bytes before an /events client is dropped
+NOTIFY_COALESCE_WINDOW = 0.05  # Seconds to wait for more toasts in a burst
+
+
+def _wait_port(port, timeout=STARTUP_TIMEOUT):
+    """Wait until something is listening on a local port. Returns True if it came up."""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        try:
+            with socket.create_connection(('127.0.0.1', port), 0.1):
+                return True
+        except OSError:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+
+
+def _wait_ports_closed(ports, timeout=SHUTDOWN_TIMEOUT):
+    """Wait until nothing accepts connections on any of the ports. Returns True if they all closed."""
+    deadline = time.monotonic() + timeout
+    pending = list(ports)
+    while True:
+        still_open = []
+        for port in pending:
+            try:
+                with socket.create_connection(('127.0.0.1', port), 0.05):
+                    still_open.append(port)
+            except OSError:
+                # A live listener on loopback accepts immediately. Windows retries
+                # SYNs to closed ports, so a timeout here also means nobody is listening.
+                pass
+        pending = still_open
+        if not pending:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+
+
+def _http_response(body, status=200):
+    """Build a complete HTTP response around an already-encoded JSON body."""
+    reason = 'OK' if status == 200 else 'Not Found'
+    return (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode() + body
+
+
+# Responses that never change are serialized once at load time
+_START_RESPONSE = _http_response(_dumps({'action': 'start', 'message': 'Starting servers...'}))
+_STOP_RESPONSE = _http_response(_dumps({'action': 'stop', 'message': 'Stopping servers...'}))
+_RESTART_RESPONSE = _http_response(_dumps({'action': 'restart', 'message': 'Restarting servers...'}))
+_EVENTS_HEADER = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n\r\n"
+)
+_NOT_FOUND_RESPONSE = _http_response(
+    _dumps({'error': 'Unknown endpoint', 'endpoints': ['/status', '/events', '/start', '/stop', '/restart']}), 404
+)
+
+
+class ControlHandler:
+    """Minimal asyncio HTTP handler for remote control of the tray app.
+
+    Only the request line is parsed; headers are drained and ignored.
+    """
     manager = None  # Set by ServerManager
 
-    def log_message(self, format, *args):
-        pass  # Suppress logging
-
-    def send_json(self, data, status=200):
-        self.send_response(status)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
-
-    def do_GET(self):
-        if self.path == '/status':
-            status, color = self.manager.get_status()
-            traefik_running = self.manager.is_process_running(self.manager.traefik_process)
-            self.send_json({
-                'status': status,
-                'running': self.manager.running,
-                'traefik_enabled': self.manager.traefik_enabled,
-                'traefik_running': traefik_running
-            })
-        elif self.path == '/start':
-            threading.Thread(target=self.manager.start_servers).start()
-            self.send_json({'action': 'start', 'message': 'Starting servers...'})
-        elif self.path == '/stop':
-            threading.Thread(target=self.manager.stop_servers).start()
-            self.send_json({'action': 'stop', 'message': 'Stopping servers...'})
-        elif self.path == '/restart':
-            threading.Thread(target=self.manager.restart_servers).start()
-            self.send_json({'action': 'restart', 'message': 'Restarting servers...'})
+    @staticmethod
+    def send_json(data, status=200):
+        """Build an HTTP response for a dynamic JSON payload."""
+        return _http_response(_dumps(data), status)
+
+    @classmethod
+    async def handle(cls, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.split()
+            path = parts[1].decode('latin-1') if len(parts) > 1 else ''
+            if path == '/events':
+                await cls.stream_events(reader, writer)
+            else:
+                writer.write(cls.do_GET(path))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @classmethod
+    async def stream_events(cls, reader, writer):
+        """Hold the connection open and push a status event on every transition."""
+        writer.write(_EVENTS_HEADER + cls.manager.status_event())
+        await writer.drain()
+        cls.manager._subscribers.add(writer)
+        try:
+            # Clients never send anything after the request; EOF means they left
+            while await reader.read(1024):
+                pass
+        finally:
+            cls.manager._subscribers.discard(writer)
+
+    @classmethod
+    def do_GET(cls, path):
+        if path == '/status':
+            return cls.send_json(cls.manager.status_payload())
+        elif path == '/start':
+            threading.Thread(target=cls.manager.start_servers).start()
+            return _START_RESPONSE
+        elif path == '/stop':
+            threading.Thread(target=cls.manager.stop_servers).start()
+            return _STOP_RESPONSE
+        elif path == '/restart':
+            threading.Thread(target=cls.manager.restart_servers).start()
+            return _RESTART_RESPONSE
         else:
-            self.send_json({'error': 'Unknown endpoint', 'endpoints': ['/status', '/start', '/stop', '/restart']}, 404)
+            return _NOT_FOUND_RESPONSE
 
 
 class ServerManager:
+    _KOALA = None  # Koala glyph without underline, rendered on first use
+
+    # Tray menu as (label, handler method[, attribute for checked state]); None is a separator
+    _MENU_SPEC = (
+        ('Start Servers', 'start_servers'),
+        ('Stop Servers', 'stop_servers'),
+        ('Restart Servers', 'restart_servers'),
+        None,
+        ('Open Game (HTTPS)', 'open_https_game'),
+        ('Open Game (Local)', 'open_game'),
+        ('Open Colyseus Monitor', 'open_monitor'),
+        ('Open Traefik Dashboard', 'open_traefik_dashboard'),
+        None,
+        ('Traefik Enabled', 'toggle_traefik', 'traefik_enabled'),
+        ('Show Status', 'show_status'),
+        None,
+        ('Quit', 'quit_app'),
+    )
+
     def __init__(self):
         self.colyseus_process = None
         self.http_process = None
@@ -90,33 +247,60 @@ class ServerManager:
         self.traefik_enabled = True  # Start with Traefik by default
         self.icon = None
         self.control_server = None
+        self._job = None  # Job object owning every server process tree
+        self._stopped_evt = threading.Event()  # Set once stop_servers has fully finished
+        self._status_cache = (0.0, None)  # (monotonic timestamp, get_status() result)
+        self._status_version = 0  # Bumped on every icon/status transition
+        self._subscribers = set()  # /events stream writers, only touched on the control loop
+        self._control_loop = None
+        self._notify_q = queue.Queue()
+        if USE_WINOTIFY:
+            threading.Thread(target=self._notify_worker, daemon=True).start()
+        # Pre-render status icons so transitions are a dict lookup
+        self._icon_cache = {c: self.create_icon_image(c) for c in ("red", "yellow", "green")}
+        self._current_color = "red"
 
     def notify(self, title, message, success=True):
-        """Send a toast notification."""
+        """Queue a toast notification; the worker thread shows it."""
         if USE_WINOTIFY:
-            try:
-                toast = Notification(
-                    app_id="711BF Gaming",
-                    title=title,
-                    msg=message,
-                    duration="short"
-                )
-                toast.set_audio(audio.Default, loop=False)
-                toast.show()
-            except Exception as e:
-                print(f"Toast error: {e}")
+            self._notify_q.put((title, message))
         print(f"[{'OK' if success else 'ERROR'}] {title}: {message}")
 
-    def create_icon_image(self, color="green"):
-        """Create a koala emoji icon with colored status underline."""
-        from PIL import ImageFont
+    def _notify_worker(self):
+        """Show queued toasts, keeping only the newest of each run of same-title toasts."""
+        while True:
+            batch = [self._notify_q.get()]
+            # Collect the rest of a burst so adjacent duplicates can be coalesced
+            while True:
+                try:
+                    batch.append(self._notify_q.get(timeout=NOTIFY_COALESCE_WINDOW))
+                except queue.Empty:
+                    break
+
+            for i, (title, message) in enumerate(batch):
+                if i + 1 < len(batch) and batch[i + 1][0] == title:
+                    continue  # Superseded by the next toast with the same title
+                try:
+                    toast = Notification(
+                        app_id="711BF Gaming",
+                        title=title,
+                        msg=message,
+                        duration="short"
+                    )
+                    toast.set_audio(audio.Default, loop=False)
+                    toast.show()
+                except Exception as e:
+                    print(f"Toast error: {e}")
+
+            for _ in batch:
+                self._notify_q.task_done()
+
+    @classmethod
+    def _koala_image(cls):
+        """Rasterize the koala glyph once; status icons are copies of it."""
+        if cls._KOALA is not None:
+            return cls._KOALA
 
-        colors = {
-            "green": "#22c55e",
-            "red": "#ef4444",
-            "yellow": "#eab308",
-            "gray": "#6b7280"
-        }
         img = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
 
@@ -136,6 +320,20 @@ class ServerManager:
             draw.ellipse([46, 6, 64, 26], fill="#606060")  # Right ear
             draw.ellipse([20, 28, 44, 46], fill="#404040")  # Nose
 
+        cls._KOALA = img
+        return img
+
+    def create_icon_image(self, color="green"):
+        """Create a koala emoji icon with colored status underline."""
+        colors = {
+            "green": "#22c55e",
+            "red": "#ef4444",
+            "yellow": "#eab308",
+            "gray": "#6b7280"
+        }
+        img = self._koala_image().copy()
+        draw = ImageDraw.Draw(img)
+
         # Colored underline at bottom
         underline_color = colors.get(color, colors["gray"])
         draw.rectangle([0, 58, 64, 64], fill=underline_color)
@@ -143,9 +341,39 @@ class ServerManager:
         return img
 
     def update_icon(self, color):
-        """Update the tray icon color."""
+        """Update the tray icon color and notify /events subscribers."""
+        if color == self._current_color:
+            return  # Skip the Shell_NotifyIcon round-trip and duplicate events
+        self._current_color = color
         if self.icon:
-            self.icon.icon = self.create_icon_image(color)
+            self.icon.icon = self._icon_cache[color]
+        self._status_version += 1
+        if self._control_loop is not None and self._subscribers:
+            self._control_loop.call_soon_threadsafe(self._broadcast, self.status_event())
+
+    def status_payload(self):
+        """Build the status dict served by /status and /events."""
+        status, _ = self.get_status()
+        return {
+            'status': status,
+            'running': self.running,
+            'traefik_enabled': self.traefik_enabled,
+            'traefik_running': self.is_process_running(self.traefik_process)
+        }
+
+    def status_event(self):
+        """Encode the current status as a server-sent event."""
+        return f"id: {self._status_version}\n".encode() + b"data: " + _dumps(self.status_payload()) + b"\n\n"
+
+    def _broadcast(self, event):
+        """Write an event to every /events subscriber (runs on the control loop)."""
+        for writer in list(self._subscribers):
+            # Drop clients that closed or stopped reading rather than buffer forever
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > SSE_MAX_BUFFER:
+                self._subscribers.discard(writer)
+                writer.close()
+            else:
+                writer.write(event)
 
     def is_process_running(self, process):
         """Check if a subprocess is still running."""
@@ -154,19 +382,50 @@ class ServerManager:
         return process.poll() is None
 
     def get_status(self):
-        """Get current server status."""
+        """Get current server status (cached briefly to absorb bursts of queries)."""
+        ts, cached = self._status_cache
+        now = time.monotonic()
+        if cached is not None and now - ts < STATUS_CACHE_TTL:
+            return cached
+
         colyseus_up = self.is_process_running(self.colyseus_process)
         http_up = self.is_process_running(self.http_process)
 
         if colyseus_up and http_up:
-            return "running", "green"
+            result = "running", "green"
         elif colyseus_up or http_up:
-            return "partial", "yellow"
+            result = "partial", "yellow"
         else:
-            return "stopped", "red"
+            result = "stopped", "red"
+        self._status_cache = (now, result)
+        return result
 
     def kill_existing_processes(self, include_traefik=True):
         """Kill any existing server processes."""
+        if not USE_PSUTIL:
+            self._kill_existing_processes_powershell(include_traefik)
+            return
+
+        try:
+            targets = []
+            for p in psutil.process_iter(['name', 'cmdline']):
+                name = (p.info['name'] or '').lower()
+                cmdline = p.info['cmdline'] or []
+                if (name == 'node.exe'
+                        or (name.startswith('python') and any('http.server' in a for a in cmdline))
+                        or (include_traefik and name == 'traefik.exe')):
+                    try:
+                        p.kill()
+                        targets.append(p)
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        pass
+            # Returns as soon as the killed processes have exited
+            psutil.wait_procs(targets, timeout=1)
+        except Exception as e:
+            print(f"Error killing processes: {e}")
+
+    def _kill_existing_processes_powershell(self, include_traefik=True):
+        """Kill existing server processes via PowerShell (psutil fallback)."""
         try:
             # Kill node processes (Colyseus)
             subprocess.run(
@@ -188,6 +447,35 @@ class ServerManager:
         except Exception as e:
             print(f"Error killing processes: {e}")
 
+    def _create_job(self):
+        """Create a job object that kills all of its processes when its handle is closed."""
+        job = win32job.CreateJobObject(None, "")
+        info = win32job.QueryInformationJobObject(job, win32job.JobObjectExtendedLimitInformation)
+        info['BasicLimitInformation']['LimitFlags'] |= win32job.JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+        win32job.SetInformationJobObject(job, win32job.JobObjectExtendedLimitInformation, info)
+        return job
+
+    def _spawn(self, args, cwd):
+        """Start a server process in its own process group, inside the job if there is one."""
+        process = subprocess.Popen(
+            args,
+            cwd=str(cwd),
+            # Don't hand the tray's console/pipes to the servers (tsx --watch is chatty)
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+        )
+        if self._job is not None:
+            handle = win32api.OpenProcess(
+                win32con.PROCESS_SET_QUOTA | win32con.PROCESS_TERMINATE, False, process.pid
+            )
+            try:
+                win32job.AssignProcessToJobObject(self._job, handle)
+            finally:
+                win32api.CloseHandle(handle)
+        return process
+
     def start_servers(self, _=None):
         """Start all game servers."""
         if self.running:
@@ -206,98 +494,128 @@ class ServerManager:
             if not python_exe.exists():
                 python_exe = "python"
 
-            # Start Colyseus server
-            self.colyseus_process = subprocess.Popen(
-                "npx tsx --watch src/index.ts",
-                cwd=str(SERVER_PATH),
-                creationflags=subprocess.CREATE_NO_WINDOW,
-                shell=True
+            # Children (and anything they spawn) join the job so one close reaps them all
+            if USE_JOB_OBJECTS:
+                self._job = self._create_job()
+
+            # Launch all servers back-to-back; they don't depend on each other
+            self.colyseus_process = self._spawn(
+                ["npx.cmd", "tsx", "--watch", "src/index.ts"], SERVER_PATH
             )
-            time.sleep(3)  # Give server more time to initialize
+            ports = [COLYSEUS_PORT]
 
             # Start HTTP server for client
-            self.http_process = subprocess.Popen(
-                f'"{python_exe}" -m http.server 3000 --bind 0.0.0.0',
-                cwd=str(CLIENT_PATH),
-                creationflags=subprocess.CREATE_NO_WINDOW,
-                shell=True
+            self.http_process = self._spawn(
+                [str(python_exe), "-m", "http.server", str(HTTP_PORT), "--bind", "0.0.0.0"], CLIENT_PATH
             )
-            time.sleep(1)
+            ports.append(HTTP_PORT)
 
             # Start Traefik if enabled and available
-            if self.traefik_enabled and TRAEFIK_EXE.exists():
-                self.traefik_process = subprocess.Popen(
-                    f'"{TRAEFIK_EXE}" --configFile=traefik.yml',
-                    cwd=str(TRAEFIK_PATH),
-                    creationflags=subprocess.CREATE_NO_WINDOW,
-                    shell=True
+            if self.traefik_enabled and _TRAEFIK_AVAILABLE:
+                self.traefik_process = self._spawn(
+                    [str(TRAEFIK_EXE), "--configFile=traefik.yml"], TRAEFIK_PATH
                 )
-                time.sleep(1)
+                ports.append(TRAEFIK_DASHBOARD_PORT)
+
+            # Wait for all servers to come up concurrently
+            with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+                futures = {executor.submit(_wait_port, port): port for port in ports}
+                wait(futures, return_when=ALL_COMPLETED)
+            for future, port in futures.items():
+                if not future.result():
+                    print(f"[WARN] Nothing listening on port {port} after {STARTUP_TIMEOUT}s")
 
             self.running = True
+            self._status_cache = (0.0, None)
             self.update_icon("green")
 
-            if self.traefik_enabled and TRAEFIK_EXE.exists():
+            if self.traefik_enabled and _TRAEFIK_AVAILABLE:
                 self.notify("Servers Started", "HTTPS: https://game.711bf.org\nLocal: http://localhost:3000")
             else:
                 self.notify("Servers Started", "Game client: http://localhost:3000\nColyseus: ws://localhost:2567")
 
         except Exception as e:
+            self._status_cache = (0.0, None)
             self.update_icon("red")
             self.notify("Start Failed", str(e), success=False)
 
+    def _kill_one(self, process):
+        """Terminate a server process if it's still alive and wait for it to exit."""
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                process.terminate()
+            except OSError:
+                pass  # Already exiting, e.g. killed by the job object
+        process.wait(5)
+
     def stop_servers(self, _=None):
         """Stop all game servers."""
         if not self.running:
             self.notify("Already Stopped", "Servers are not running", success=False)
+            self._stopped_evt.set()
             return
 
         self.notify("Stopping Servers", "Shutting down game servers...")
         self.update_icon("yellow")
 
         try:
-            if self.colyseus_process:
-                self.colyseus_process.terminate()
-                self.colyseus_process = None
+            processes = [self.colyseus_process, self.http_process, self.traefik_process]
+            ports = [COLYSEUS_PORT, HTTP_PORT]
+            if self.traefik_process:
+                ports.append(TRAEFIK_DASHBOARD_PORT)
 
-            if self.http_process:
-                self.http_process.terminate()
-                self.http_process = None
+            if self._job is not None:
+                # KILL_ON_JOB_CLOSE takes down every process in every tree at once
+                win32api.CloseHandle(self._job)
+                self._job = None
 
-            if self.traefik_process:
-                self.traefik_process.terminate()
-                self.traefik_process = None
+            # Terminate and wait on each server in parallel so teardowns overlap
+            with ThreadPoolExecutor(max_workers=len(processes)) as executor:
+                list(executor.map(self._kill_one, processes))
+            self.colyseus_process = None
+            self.http_process = None
+            self.traefik_process = None
+
+            if not USE_JOB_OBJECTS:
+                # npx.cmd still runs via cmd.exe and tsx --watch forks its own
+                # node child, so sweep up anything terminate() didn't reach
+                self.kill_existing_processes()
 
-            # Also kill any orphaned processes
-            self.kill_existing_processes()
+            if not _wait_ports_closed(ports):
+                print(f"[WARN] Ports still in use after {SHUTDOWN_TIMEOUT}s: {ports}")
 
             self.running = False
+            self._status_cache = (0.0, None)
             self.update_icon("red")
             self.notify("Servers Stopped", "All game servers have been stopped")
 
         except Exception as e:
+            self._status_cache = (0.0, None)
             self.notify("Stop Failed", str(e), success=False)
+        finally:
+            self._stopped_evt.set()
 
     def restart_servers(self, _=None):
         """Restart all game servers."""
         self.notify("Restarting Servers", "Restarting game servers...")
+        self._stopped_evt.clear()
         self.stop_servers()
-        time.sleep(2)
+        # Start as soon as the old servers have released their ports
+        self._stopped_evt.wait(timeout=SHUTDOWN_TIMEOUT)
         self.start_servers()
 
     def open_game(self, _=None):
         """Open the game in browser."""
-        import webbrowser
         webbrowser.open("http://localhost:3000")
 
     def open_monitor(self, _=None):
         """Open Colyseus monitor in browser."""
-        import webbrowser
         webbrowser.open("http://localhost:2568/colyseus")
 
     def open_traefik_dashboard(self, _=None):
         """Open Traefik dashboard in browser."""
-        import webbrowser
         webbrowser.open("http://localhost:8080/dashboard/")
 
     def toggle_traefik(self, _=None):
@@ -328,41 +646,46 @@ class ServerManager:
         """Quit the tray app."""
         self.stop_servers()
         self.notify("Goodbye", "711BF Gaming tray app closed")
+        self._notify_q.join()  # Let pending toasts show before the process exits
         if self.icon:
             self.icon.stop()
 
     def create_menu(self):
-        """Create the tray menu."""
-        return pystray.Menu(
-            item('Start Servers', self.start_servers),
-            item('Stop Servers', self.stop_servers),
-            item('Restart Servers', self.restart_servers),
-            pystray.Menu.SEPARATOR,
-            item('Open Game (HTTPS)', lambda _: self.open_https_game()),
-            item('Open Game (Local)', self.open_game),
-            item('Open Colyseus Monitor', self.open_monitor),
-            item('Open Traefik Dashboard', self.open_traefik_dashboard),
-            pystray.Menu.SEPARATOR,
-            item('Traefik Enabled', self.toggle_traefik, checked=lambda _: self.traefik_enabled),
-            item('Show Status', self.show_status),
-            pystray.Menu.SEPARATOR,
-            item('Quit', self.quit_app)
-        )
+        """Create the tray menu from _MENU_SPEC."""
+        items = []
+        for entry in self._MENU_SPEC:
+            if entry is None:
+                items.append(pystray.Menu.SEPARATOR)
+                continue
+            label, handler, *checked_attr = entry
+            checked = None
+            if checked_attr:
+                checked = lambda _, attr=checked_attr[0]: getattr(self, attr)
+            items.append(item(label, getattr(self, handler), checked=checked))
+        return pystray.Menu(*items)
 
     def open_https_game(self):
         """Open the game via HTTPS in browser."""
-        import webbrowser
         webbrowser.open("https://game.711bf.org")
 
     def start_control_server(self):
-        """Start the HTTP control server in a background thread."""
+        """Run the asyncio control server (blocks; call from a background thread)."""
         ControlHandler.manager = self
         try:
-            self.control_server = HTTPServer(('127.0.0.1', CONTROL_PORT), ControlHandler)
-            self.control_server.serve_forever()
+            asyncio.run(self._serve_control())
         except Exception as e:
             print(f"Control server error: {e}")
 
+    async def _serve_control(self):
+        self._control_loop = asyncio.get_running_loop()
+        # Loopback TCP rather than AF_UNIX/named pipes: CPython has no AF_UNIX on
+        # Windows, and the API needs to stay reachable from curl and browsers
+        self.control_server = await asyncio.start_server(
+            ControlHandler.handle, '127.0.0.1', CONTROL_PORT
+        )
+        async with self.control_server:
+            await self.control_server.serve_forever()
+
     def run(self):
         """Run the tray application."""
         # Start control server in background
@@ -371,7 +694,7 @@ class ServerManager:
 
         self.icon = pystray.Icon(
             "711bf_gaming",
-            self.create_icon_image("red"),
+            self._icon_cache[self._current_color],
             "711BF Gaming Server",
             self.create_menu()
         )